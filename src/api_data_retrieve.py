@@ -1,28 +1,22 @@
+import msgspec
 import requests
-from common import headers, DATABASE_NAME
-import mysql.connector
+from common import headers
+from tmdb_structs import decode_discover_page, decode_movie_credits
+from db_connections import get_write_connection
 from mysql.connector import Error
 
 # Base URL for the TMDb API
 BASE_URL = 'https://api.themoviedb.org/3'
 
 
-DB_CONFIG = {
-    'host': '127.0.0.2',
-    'port': '3333',
-    'user': 'natanel',
-    'password': 'nat72836',
-    'database': DATABASE_NAME
-}
+# Default commit policy for populate_movies_and_credits_for_genre:
+# commit after this many movies, or after this many written rows.
+COMMIT_EVERY_MOVIES = 5
+COMMIT_EVERY_ROWS = 1000
 
 def get_db_connection():
-    """Returns a MySQL connection using the specified DB_CONFIG."""
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except Error as e:
-        print(f"Error connecting to DB: {e}")
-        return None
+    """Returns a MySQL connection to the primary (write) server."""
+    return get_write_connection()
 
 def get_all_genres():
     """
@@ -46,15 +40,16 @@ def get_movies_by_genre(genre_id, page=1):
     Endpoint: GET /discover/movie?with_genres=<genre_id>
 
     :param genre_id: The genre ID (int or str) to filter by.
-    :return: A JSON object containing the matching movies.
-    :rtype: dict
+    :return: The matching movies, decoded into typed structs (id, title, popularity).
+    :rtype: tmdb_structs.DiscoverPage
     :raises HTTPError: If the request status code is 4xx or 5xx.
+    :raises msgspec.DecodeError: If the response body cannot be decoded.
     """
     url = f"{BASE_URL}/discover/movie"
     params = {"with_genres": str(genre_id), "page": page}
     response = requests.get(url, headers=headers, params=params)
     response.raise_for_status()
-    return response.json()
+    return decode_discover_page(response.content)
 
 def get_movie_credits(movie_id):
     """
@@ -63,14 +58,15 @@ def get_movie_credits(movie_id):
     Endpoint: GET /movie/<movie_id>/credits
 
     :param movie_id: The movie's ID (int or str).
-    :return: A JSON object containing cast and crew details.
-    :rtype: dict
+    :return: Up to 50 cast and 50 crew members, decoded into typed structs.
+    :rtype: tmdb_structs.MovieCredits
     :raises HTTPError: If the request status code is 4xx or 5xx.
+    :raises msgspec.DecodeError: If the response body cannot be decoded.
     """
     url = f"{BASE_URL}/movie/{movie_id}/credits"
     response = requests.get(url, headers=headers)
     response.raise_for_status()
-    return response.json()
+    return decode_movie_credits(response.content)
 
 
 
@@ -109,7 +105,10 @@ def populate_genres():
         conn.close()
 
 
-def populate_movies_and_credits_for_genre(genre_id, max_movies=20):
+def populate_movies_and_credits_for_genre(genre_id, max_movies=20,
+                                          commit_every_movies=COMMIT_EVERY_MOVIES,
+                                          commit_every_rows=COMMIT_EVERY_ROWS,
+                                          resume=True):
     """
     Fetches up to `max_movies` movies from TMDb for the specified `genre_id`,
     inserting them into 'movies' and 'movie_genres'.
@@ -118,6 +117,23 @@ def populate_movies_and_credits_for_genre(genre_id, max_movies=20):
     This function loops over pages until either:
       - We have inserted `max_movies` movies, OR
       - There are no more pages/results from TMDb.
+
+    Commit policy:
+      - The work is committed in chunks, every `commit_every_movies` movies or
+        every `commit_every_rows` written rows, whichever comes first.
+      - Each movie is written inside its own SAVEPOINT, so a failing row only
+        skips that movie instead of rolling back the whole chunk.
+      - The resume point is stored in the same transaction as each chunk:
+        the page reached and the number of movies done go to
+        'ingest_progress', and the id of every committed movie goes to
+        'ingest_progress_movies'. With `resume=True` a crashed run restarts
+        at the saved page and skips the movie ids already committed. The ids,
+        not a position in the page, are what matters: /discover/movie ranks
+        by popularity, which changes between runs, so a position could skip
+        movies or insert a movie's credits twice.
+        Both are removed once the genre is fully processed.
+      - A credits payload that cannot be decoded skips that movie; a discover
+        page that cannot be decoded stops the genre, keeping its resume point.
     """
     print(f"\nPopulating up to {max_movies} movies for genre {genre_id} ...")
 
@@ -157,65 +173,148 @@ def populate_movies_and_credits_for_genre(genre_id, max_movies=20):
         VALUES (%s, %s, %s, %s)
     """
 
+    # Precompile SQL for recording the resume point
+    sql_save_progress = """
+        INSERT INTO ingest_progress (genre_id, page, movies_fetched)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            page = VALUES(page),
+            movies_fetched = VALUES(movies_fetched)
+    """
+
+    # Precompile SQL for recording a movie as done for this genre
+    sql_save_movie_done = """
+        INSERT IGNORE INTO ingest_progress_movies (genre_id, movie_id)
+        VALUES (%s, %s)
+    """
+
     movies_fetched = 0
     page = 1
+    done_movie_ids = set()
 
     try:
+        if resume:
+            cursor.execute(
+                "SELECT page, movies_fetched FROM ingest_progress WHERE genre_id = %s",
+                (genre_id,)
+            )
+            saved = cursor.fetchone()
+            if saved:
+                page, movies_fetched = saved
+                cursor.execute(
+                    "SELECT movie_id FROM ingest_progress_movies WHERE genre_id = %s",
+                    (genre_id,)
+                )
+                done_movie_ids = {row[0] for row in cursor.fetchall()}
+                print(f"Resuming genre {genre_id} at page {page} "
+                      f"({movies_fetched} movies already committed).")
+        else:
+            cursor.execute("DELETE FROM ingest_progress WHERE genre_id = %s", (genre_id,))
+            cursor.execute("DELETE FROM ingest_progress_movies WHERE genre_id = %s", (genre_id,))
+            conn.commit()
+
+        movies_since_commit = 0
+        rows_since_commit = 0
+        completed = True
+
         while movies_fetched < max_movies:
             # Call TMDb discover endpoint for the specified genre + page
-            tmdb_data = get_movies_by_genre(genre_id=genre_id, page=page)
-            results = tmdb_data.get('results', [])
+            try:
+                tmdb_data = get_movies_by_genre(genre_id=genre_id, page=page)
+            except msgspec.DecodeError as e:
+                # Keep what is done and the resume point, so a later run retries this page.
+                print(f"Bad discover payload for genre {genre_id}, page {page}; stopping this genre: {e}")
+                cursor.execute(sql_save_progress, (genre_id, page, movies_fetched))
+                conn.commit()
+                completed = False
+                break
+            results = tmdb_data.results
             if not results:
                 break  # No more movies available
             
             print(f"Processing page {page} and {len(results)} movies...")
             for movie in results:
-
-                tmdb_movie_id = movie['id']
-                title = movie.get('title', 'Untitled')
-                popularity = movie.get('popularity', 0.0)
-
-                # 1) Insert/Update movie
-                cursor.execute(sql_insert_movie, (tmdb_movie_id, title, popularity))
-                # 2) Link movie -> genre
-                cursor.execute(sql_insert_movie_genre, (tmdb_movie_id, genre_id))
-                
-                # 3) Fetch credits for this movie
-                credits_data = get_movie_credits(tmdb_movie_id)
-                cast_list = credits_data.get('cast', [])[:50]
-                crew_list = credits_data.get('crew', [])[:50]
-
-                print(f"\tInserted/updated movie: {title} and linked movie to genre {genre_id}")
-
-                # 4) Insert persons & credits (cast)
-                for cast_item in cast_list:
-                    person_id = cast_item['id']
-                    person_name = cast_item.get('name', 'Unknown')
-                    person_pop = cast_item.get('popularity', 0.0)
-                    character_name = cast_item.get('character', '')
-
-                    cursor.execute(sql_insert_person, (person_id, person_name, person_pop))
-                    cursor.execute(sql_insert_credit, (tmdb_movie_id, person_id, 'cast', character_name))
-
-                print(f"\tInserted {len(cast_list)} cast members for movie {title}")
-                # 5) Insert persons & credits (crew)
-                for crew_item in crew_list:
-                    person_id = crew_item['id']
-                    person_name = crew_item.get('name', 'Unknown')
-                    person_pop = crew_item.get('popularity', 0.0)
-                    job = crew_item.get('job', '')
-
-                    cursor.execute(sql_insert_person, (person_id, person_name, person_pop))
-                    cursor.execute(sql_insert_credit, (tmdb_movie_id, person_id, 'crew', job))
-
-                print(f"\tInserted {len(crew_list)} crew members for movie {title}")
-                movies_fetched += 1
+                if movies_fetched >= max_movies:
+                    break
+
+                tmdb_movie_id = movie.id
+                if tmdb_movie_id in done_movie_ids:
+                    continue  # Already committed by this run or the crashed one
+                title = movie.title
+                popularity = movie.popularity
+
+                # Fetch credits before writing this movie's rows. Rows written
+                # earlier in the same chunk stay locked until the next commit,
+                # so locks are held across at most one chunk's HTTP calls
+                # (`commit_every_movies` credits fetches plus a page fetch).
+                try:
+                    credits_data = get_movie_credits(tmdb_movie_id)
+                except msgspec.DecodeError as e:
+                    print(f"\tSkipping movie {title} ({tmdb_movie_id}): bad credits payload: {e}")
+                    continue
+                cast_list = credits_data.cast
+                crew_list = credits_data.crew
+
+                cursor.execute("SAVEPOINT movie_sp")
+                try:
+                    # 1) Insert/Update movie
+                    cursor.execute(sql_insert_movie, (tmdb_movie_id, title, popularity))
+                    # 2) Link movie -> genre
+                    cursor.execute(sql_insert_movie_genre, (tmdb_movie_id, genre_id))
+                    print(f"\tInserted/updated movie: {title} and linked movie to genre {genre_id}")
+
+                    # 3) Insert persons & credits (cast)
+                    for cast_item in cast_list:
+                        person_id = cast_item.id
+                        person_name = cast_item.name
+                        person_pop = cast_item.popularity
+                        character_name = cast_item.character
+
+                        cursor.execute(sql_insert_person, (person_id, person_name, person_pop))
+                        cursor.execute(sql_insert_credit, (tmdb_movie_id, person_id, 'cast', character_name))
+
+                    print(f"\tInserted {len(cast_list)} cast members for movie {title}")
+                    # 4) Insert persons & credits (crew)
+                    for crew_item in crew_list:
+                        person_id = crew_item.id
+                        person_name = crew_item.name
+                        person_pop = crew_item.popularity
+                        job = crew_item.job
+
+                        cursor.execute(sql_insert_person, (person_id, person_name, person_pop))
+                        cursor.execute(sql_insert_credit, (tmdb_movie_id, person_id, 'crew', job))
+
+                    print(f"\tInserted {len(crew_list)} crew members for movie {title}")
+                    cursor.execute(sql_save_movie_done, (genre_id, tmdb_movie_id))
+                    cursor.execute("RELEASE SAVEPOINT movie_sp")
+                    done_movie_ids.add(tmdb_movie_id)
+                    movies_fetched += 1
+                    movies_since_commit += 1
+                    rows_since_commit += 2 + 2 * (len(cast_list) + len(crew_list))
+
+                except Error as e:
+                    # Undo only this movie's rows and keep going with the chunk.
+                    print(f"\tSkipping movie {title} ({tmdb_movie_id}): {e}")
+                    cursor.execute("ROLLBACK TO SAVEPOINT movie_sp")
+
+                # 5) Commit the chunk together with the resume point
+                if (movies_since_commit >= commit_every_movies
+                        or rows_since_commit >= commit_every_rows):
+                    cursor.execute(sql_save_progress, (genre_id, page, movies_fetched))
+                    conn.commit()
+                    print(f"Committed chunk: {movies_fetched} movies done for genre {genre_id}.")
+                    movies_since_commit = 0
+                    rows_since_commit = 0
 
             # Move to the next page
             page += 1
-        
-        conn.commit()
-        print(f"Inserted/updated {movies_fetched} movies for genre {genre_id} successfully.")
+
+        if completed:
+            # The genre is complete: commit the tail and drop the resume point.
+            cursor.execute("DELETE FROM ingest_progress WHERE genre_id = %s", (genre_id,))
+            cursor.execute("DELETE FROM ingest_progress_movies WHERE genre_id = %s", (genre_id,))
+            conn.commit()
+            print(f"Inserted/updated {movies_fetched} movies for genre {genre_id} successfully.")
 
     except Error as e:
         print(f"Error in populate_movies_and_credits_for_genre({genre_id}): {e}")
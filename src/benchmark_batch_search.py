@@ -0,0 +1,116 @@
+import statistics
+import time
+
+from mysql.connector import Error
+from queries_db_script import (get_db_connection, query_3, query_4,
+                               query_3_batch, query_4_batch)
+
+TERM_COUNTS = [1, 10, 100]
+
+# Timed rounds per term count; serial and batch alternate which runs first.
+ROUNDS = 4
+
+
+def sample_terms(sql, count):
+    """
+    Returns up to `count` distinct search terms taken from the data itself:
+    the first word of each value returned by `sql`.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return []
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql)
+        words = [row[0].split()[0] for row in cursor.fetchall() if row[0] and row[0].split()]
+        return list(dict.fromkeys(words))[:count]
+    except Error as e:
+        print(f"Error sampling search terms: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def timed(func, *args):
+    """Returns (result, wall-clock seconds) of func(*args)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def same_results(single_rows, batch_rows, limit):
+    """
+    Checks that a batch result matches the per-term call for one term.
+
+    Both must hold the same movie ids. When the per-term call hit `limit`,
+    the two may legitimately pick different rows: query_3 on ties in
+    popularity at the cut-off, query_4 because its LIMIT has no ORDER BY.
+    Then only the row count (and, for query_3, the popularities) must match.
+    """
+    single_ids = {row['id'] for row in single_rows}
+    batch_ids = {row['id'] for row in batch_rows}
+    if single_ids == batch_ids:
+        return True
+    if len(single_rows) < limit or len(batch_rows) != len(single_rows):
+        return False
+    if 'popularity' in single_rows[0]:
+        return (sorted(row['popularity'] for row in single_rows)
+                == sorted(row['popularity'] for row in batch_rows))
+    return True
+
+
+def benchmark(label, single, batch, terms, limit):
+    """
+    Compares N calls of `single` against one call of `batch` for N terms.
+
+    Both are run once untimed to warm the pools and the buffer pool, the
+    batch results are checked against the per-term results, and then the
+    two are timed over ROUNDS rounds in alternating order (medians reported).
+    """
+    for count in TERM_COUNTS:
+        subset = terms[:count]
+        if len(subset) < count:
+            print(f"{label:<10}{count:>6}  (only {len(subset)} terms available, skipped)")
+            continue
+
+        def run_single():
+            return {term: single(term) for term in subset}
+
+        single_results = run_single()
+        batch_results = batch(subset)
+        mismatched = [term for term in subset
+                      if not same_results(single_results[term], batch_results.get(term, []), limit)]
+        if mismatched:
+            print(f"{label:<10}{count:>6}  batch results differ for {len(mismatched)} terms, "
+                  f"e.g. {mismatched[0]!r}; not timed")
+            continue
+
+        serial_times, batched_times = [], []
+        for round_number in range(ROUNDS):
+            if round_number % 2 == 0:
+                serial_times.append(timed(run_single)[1])
+                batched_times.append(timed(batch, subset)[1])
+            else:
+                batched_times.append(timed(batch, subset)[1])
+                serial_times.append(timed(run_single)[1])
+
+        serial = statistics.median(serial_times)
+        batched = statistics.median(batched_times)
+        print(f"{label:<10}{count:>6}{serial * 1000:>14.1f}{batched * 1000:>14.1f}"
+              f"{serial / batched:>10.1f}x")
+
+
+def main():
+    titles = sample_terms("SELECT title FROM movies ORDER BY popularity DESC;", max(TERM_COUNTS))
+    roles = sample_terms("SELECT DISTINCT character_name_or_job_title FROM movie_credits;",
+                         max(TERM_COUNTS))
+
+    print(f"{'query':<10}{'terms':>6}{'serial ms':>14}{'batch ms':>14}{'speedup':>11}")
+    benchmark("query_3", query_3, query_3_batch, titles, limit=10)
+    benchmark("query_4", query_4, query_4_batch, roles, limit=100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import requests
+from common import headers
+from api_data_retrieve import BASE_URL
+from tmdb_structs import decode_discover_page, decode_movie_credits
+
+# Directory holding the recorded TMDb response bodies used by the benchmark.
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded_payloads")
+
+REPEATS = 50
+
+
+def record_payloads(genre_id=28, page=1, payload_dir=PAYLOAD_DIR):
+    """
+    Saves the raw bodies of one /discover/movie page and of the credits of
+    every movie on it, so the benchmark can run offline on real payloads.
+
+    Files are written as discover_<genre>_<page>.json and credits_<movie>.json.
+    """
+    os.makedirs(payload_dir, exist_ok=True)
+
+    response = requests.get(f"{BASE_URL}/discover/movie", headers=headers,
+                            params={"with_genres": str(genre_id), "page": page})
+    response.raise_for_status()
+    with open(os.path.join(payload_dir, f"discover_{genre_id}_{page}.json"), "wb") as f:
+        f.write(response.content)
+
+    for movie in response.json().get('results', []):
+        credits = requests.get(f"{BASE_URL}/movie/{movie['id']}/credits", headers=headers)
+        credits.raise_for_status()
+        with open(os.path.join(payload_dir, f"credits_{movie['id']}.json"), "wb") as f:
+            f.write(credits.content)
+
+    print(f"Recorded payloads into {payload_dir}")
+
+
+def load_payloads(payload_dir=PAYLOAD_DIR):
+    """
+    Reads the recorded payloads from disk.
+
+    Returns a tuple (discover_bodies, credits_bodies), each a list of bytes.
+    """
+    discover_bodies, credits_bodies = [], []
+    for name in sorted(os.listdir(payload_dir)):
+        with open(os.path.join(payload_dir, name), "rb") as f:
+            body = f.read()
+        if name.startswith("discover_"):
+            discover_bodies.append(body)
+        elif name.startswith("credits_"):
+            credits_bodies.append(body)
+    return discover_bodies, credits_bodies
+
+
+def json_discover(body):
+    """The previous decoding path: full dict tree, then pick the fields."""
+    data = json.loads(body)
+    return [(m['id'], m.get('title', 'Untitled'), m.get('popularity', 0.0))
+            for m in data.get('results', [])]
+
+
+def json_credits(body):
+    """The previous decoding path: full dict tree, then slice to 50."""
+    data = json.loads(body)
+    return data.get('cast', [])[:50], data.get('crew', [])[:50]
+
+
+def measure(decode, bodies):
+    """
+    Decodes every body REPEATS times and measures the time, then decodes
+    every body once more under tracemalloc to measure peak memory.
+
+    Returns a tuple (seconds_per_pass, peak_bytes).
+    """
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for body in bodies:
+            decode(body)
+    elapsed = (time.perf_counter() - start) / REPEATS
+
+    # Keep all the results alive, as the loader does for a page of movies.
+    tracemalloc.start()
+    kept = [decode(body) for body in bodies]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    return elapsed, peak
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "record":
+        record_payloads()
+
+    if not os.path.isdir(PAYLOAD_DIR):
+        print(f"No recorded payloads in {PAYLOAD_DIR}; "
+              f"run 'python benchmark_decoding.py record' first.")
+        return
+
+    discover_bodies, credits_bodies = load_payloads()
+    print(f"Loaded {len(discover_bodies)} discover and {len(credits_bodies)} credits payloads.\n")
+
+    cases = [
+        ("discover", json_discover, decode_discover_page, discover_bodies),
+        ("credits", json_credits, decode_movie_credits, credits_bodies),
+    ]
+    print(f"{'payload':<10}{'decoder':<10}{'ms/pass':>10}{'peak KiB':>12}")
+    for label, old_decode, new_decode, bodies in cases:
+        if not bodies:
+            continue
+        for name, decode in (("json", old_decode), ("msgspec", new_decode)):
+            elapsed, peak = measure(decode, bodies)
+            print(f"{label:<10}{name:<10}{elapsed * 1000:>10.3f}{peak / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,31 @@
+import os
+
 DATABASE_NAME = "natanel"
 
+# Write endpoint: the loader and the schema script connect here.
+PRIMARY_DB = {
+    "host": os.environ.get("MYSQL_PRIMARY_HOST", "127.0.0.2"),
+    "port": os.environ.get("MYSQL_PRIMARY_PORT", "3333"),
+    "user": os.environ.get("MYSQL_PRIMARY_USER", "natanel"),
+    "password": os.environ.get("MYSQL_PRIMARY_PASSWORD", "nat72836"),
+}
+
+# Read endpoint: query_1 .. query_5 connect here. Defaults to the primary,
+# in which case reads simply use the primary pool. A separate replica user
+# needs the REPLICATION CLIENT privilege so the replication lag can be checked.
+REPLICA_DB = {
+    "host": os.environ.get("MYSQL_REPLICA_HOST", PRIMARY_DB["host"]),
+    "port": os.environ.get("MYSQL_REPLICA_PORT", PRIMARY_DB["port"]),
+    "user": os.environ.get("MYSQL_REPLICA_USER", PRIMARY_DB["user"]),
+    "password": os.environ.get("MYSQL_REPLICA_PASSWORD", PRIMARY_DB["password"]),
+}
+
+# Connections kept open per pool.
+DB_POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", "5"))
+
+# Reads go to the primary while the replica is more than this many seconds behind.
+MAX_REPLICA_LAG_SECONDS = int(os.environ.get("MYSQL_MAX_REPLICA_LAG", "5"))
+
 VALID_TABLES = {
     "new_table_test": ["idnew_table_test", "new_table_testcol", "new_table_testcol1"],
 }
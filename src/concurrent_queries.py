@@ -0,0 +1,127 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from common import DB_POOL_SIZE
+from db_connections import strict_reads
+from queries_db_script import query_1, query_2, query_3, query_4, query_5
+
+# Seconds each query may run, counted from when it starts on a worker.
+QUERY_TIMEOUT = 30.0
+
+# Extra seconds the client waits past QUERY_TIMEOUT for the server to abort
+# the statement before giving up on the result.
+TIMEOUT_GRACE = 5.0
+
+
+class ConcurrentQueryError(Exception):
+    """
+    Raised by run_concurrently when at least one query failed or timed out.
+
+    :ivar results: Results of the queries that succeeded, by name.
+    :ivar errors: The exception of each query that failed, by name.
+    """
+
+    def __init__(self, results, errors):
+        self.results = results
+        self.errors = errors
+        details = ", ".join(f"{name}: {error!r}" for name, error in errors.items())
+        super().__init__(f"{len(errors)} of {len(results) + len(errors)} queries failed ({details})")
+
+
+def all_queries(substring_3, substring_4, min_popularity):
+    """
+    Builds the calls for query_1 .. query_5 with the given inputs, in the
+    form expected by run_concurrently / run_serially:
+      { name: (function, args) }
+    """
+    return {
+        "query_1": (query_1, ()),
+        "query_2": (query_2, ()),
+        "query_3": (query_3, (substring_3,)),
+        "query_4": (query_4, (substring_4,)),
+        "query_5": (query_5, (min_popularity,)),
+    }
+
+
+def run_serially(calls):
+    """
+    Runs the calls one after another.
+
+    Returns a tuple (results, elapsed_seconds), where results maps each
+    call name to its return value.
+    """
+    start = time.perf_counter()
+    results = {name: func(*args) for name, (func, args) in calls.items()}
+    return results, time.perf_counter() - start
+
+
+def _run_limited(func, args, timeout, started_at, name):
+    """Runs one call on a worker thread under a server-side statement limit."""
+    started_at[name] = time.perf_counter()
+    with strict_reads(max(1, int(timeout * 1000))):
+        return func(*args)
+
+
+def run_concurrently(calls, timeout=QUERY_TIMEOUT, max_workers=DB_POOL_SIZE):
+    """
+    Dispatches the independent calls in parallel on a thread pool. Each query
+    takes its own connection from the shared pool (db_connections), so
+    `max_workers` should not exceed the pool size.
+
+    `timeout` applies to each query separately, from when it starts on a
+    worker: the server aborts its statements after that time
+    (max_execution_time), which also returns its connection to the pool.
+    A call still queued behind busy workers is given up on once every worker
+    could have run its share of the calls back to back at the limit, so the
+    function always returns even if a worker hangs (e.g. on the network).
+
+    Returns a tuple (results, elapsed_seconds), where results maps each
+    call name to its return value.
+
+    :raises ValueError: If `timeout` is not positive.
+    :raises ConcurrentQueryError: If any query raised a database error, could
+                                  not get a connection, timed out, or never
+                                  started.
+    """
+    if timeout <= 0:
+        raise ValueError(f"timeout must be positive, got {timeout}")
+
+    start = time.perf_counter()
+    per_call = timeout + TIMEOUT_GRACE
+    waves = -(-len(calls) // max_workers)  # ceil(len(calls) / max_workers)
+    queued_deadline = start + waves * per_call
+    results = {}
+    errors = {}
+    started_at = {}
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            name: executor.submit(_run_limited, func, args, timeout, started_at, name)
+            for name, (func, args) in calls.items()
+        }
+        for name, future in futures.items():
+            while True:
+                begun = started_at.get(name)
+                deadline = queued_deadline if begun is None else begun + per_call
+                try:
+                    results[name] = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+                except TimeoutError:
+                    if begun is None and name in started_at:
+                        continue  # Started while we waited: switch to its own deadline
+                    if begun is None:
+                        errors[name] = TimeoutError(f"{name} never started: all workers were busy")
+                    else:
+                        errors[name] = TimeoutError(f"{name} did not finish within {timeout}s")
+                except Exception as e:
+                    errors[name] = e
+                break
+    finally:
+        # A timed-out query has already been aborted by the server, or is past
+        # the grace period; do not block on its worker thread. Calls that never
+        # started are cancelled.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if errors:
+        raise ConcurrentQueryError(results, errors)
+    return results, time.perf_counter() - start
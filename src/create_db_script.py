@@ -1,6 +1,6 @@
 import mysql.connector
 from mysql.connector import Error
-from common import DATABASE_NAME
+from common import DATABASE_NAME, PRIMARY_DB
 
 def create_db():
     """
@@ -12,7 +12,8 @@ def create_db():
       1) Connect to the MySQL server (using the credentials from common.py).
       2) Create database if it does not exist.
       3) Switch to that database.
-      4) Create each relevant table (movies, genres, movie_genres, persons, movie_credits).
+      4) Create each relevant table (movies, genres, movie_genres, persons, movie_credits,
+         ingest_progress, ingest_progress_movies).
       5) Add FULLTEXT indexes on title columns, plus other supporting indexes
          for performance (e.g., indexing popularity in persons/movies).
     """
@@ -23,12 +24,10 @@ def create_db():
     cursor = None
     try:
         # 1) Connect to the server with the given credentials.
+        #    The schema is always created on the primary (write) server.
         conn = mysql.connector.connect(
-            host="127.0.0.2",
-            port="3333",
-            user="natanel",
-            password="nat72836",
-            database=DATABASE_NAME
+            database=DATABASE_NAME,
+            **PRIMARY_DB
         )
         if conn.is_connected():
             print("Successfully connected to the MySQL server.")
@@ -116,6 +115,36 @@ def create_db():
         """)
         print("'movie_credits' table created or already exists.")
 
+        # ---------------------------------------------------------------------
+        # Create 'ingest_progress' table
+        # ---------------------------------------------------------------------
+        # Resume point of the loader, one row per genre: the TMDb page reached
+        # by the last committed chunk.
+        print("Creating 'ingest_progress' table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_progress (
+                genre_id INT PRIMARY KEY,
+                page INT NOT NULL,
+                movies_fetched INT NOT NULL
+            ) ENGINE=InnoDB;
+        """)
+        print("'ingest_progress' table created or already exists.")
+
+        # ---------------------------------------------------------------------
+        # Create 'ingest_progress_movies' table
+        # ---------------------------------------------------------------------
+        # Movies already committed by an unfinished loader run, per genre,
+        # so a resumed run skips them even if TMDb's ranking has changed.
+        print("Creating 'ingest_progress_movies' table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_progress_movies (
+                genre_id INT,
+                movie_id INT,
+                PRIMARY KEY (genre_id, movie_id)
+            ) ENGINE=InnoDB;
+        """)
+        print("'ingest_progress_movies' table created or already exists.")
+
         # ---------------------------------------------------------------------
         # Create FULLTEXT index on movies.title
         # ---------------------------------------------------------------------
@@ -0,0 +1,200 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from mysql.connector import Error, errorcode, pooling
+from common import (DATABASE_NAME, PRIMARY_DB, REPLICA_DB, DB_POOL_SIZE,
+                    MAX_REPLICA_LAG_SECONDS)
+
+# How long (in seconds) a replication lag measurement is trusted before
+# the replica is asked again.
+LAG_CHECK_INTERVAL = 2.0
+
+_pools = {}
+# Guards pool creation when connections are requested from several threads.
+_pools_lock = threading.Lock()
+
+# (time of the last check, whether the replica was usable at that time)
+_replica_state = {"checked_at": 0.0, "usable": False}
+# Held by the one thread refreshing _replica_state; the others use the cached state.
+_replica_check_lock = threading.Lock()
+
+# With the default configuration both endpoints are the same server:
+# there is then no separate read pool and no lag check.
+REPLICA_IS_PRIMARY = REPLICA_DB == PRIMARY_DB
+
+
+# Per-thread statement limit set by strict_reads(); None outside of it.
+_thread_settings = threading.local()
+
+
+class ReplicaConfigError(Exception):
+    """Raised when the replica is configured but its lag cannot be checked."""
+
+
+@contextmanager
+def strict_reads(max_execution_ms):
+    """
+    Within this block, for the current thread only:
+      - read connections get SET SESSION max_execution_time, so the server
+        aborts a SELECT after `max_execution_ms` and its connection is freed;
+      - get_read_connection raises instead of returning None, and the
+        query functions re-raise database errors (see raise_errors()).
+    The pool resets the session when a connection is returned, so the
+    limit does not leak to other callers.
+    """
+    _thread_settings.max_execution_ms = max_execution_ms
+    try:
+        yield
+    finally:
+        _thread_settings.max_execution_ms = None
+
+
+def raise_errors():
+    """True inside strict_reads(): errors must be raised, not turned into []."""
+    return getattr(_thread_settings, "max_execution_ms", None) is not None
+
+
+def _get_pool(name, endpoint):
+    """
+    Returns the connection pool for `name`, creating it on first use.
+    Connections taken from a pool go back to it on conn.close().
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = pooling.MySQLConnectionPool(
+                pool_name=f"{DATABASE_NAME}_{name}",
+                pool_size=DB_POOL_SIZE,
+                database=DATABASE_NAME,
+                **endpoint
+            )
+            _pools[name] = pool
+        return pool
+
+
+def _replica_lag(conn):
+    """
+    Returns the replica's lag in seconds, or None if it is unknown: either
+    replication is stopped, or the server is not a replica at all (no status
+    row, e.g. never configured or after RESET REPLICA ALL). Nothing feeds the
+    server in the latter case, so it must not be read from either.
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        try:
+            # MySQL 8.0.22+
+            cursor.execute("SHOW REPLICA STATUS")
+            status = cursor.fetchone()
+            lag_key = "Seconds_Behind_Source"
+        except Error as e:
+            if e.errno != errorcode.ER_PARSE_ERROR:
+                raise
+            # Older servers
+            cursor.execute("SHOW SLAVE STATUS")
+            status = cursor.fetchone()
+            lag_key = "Seconds_Behind_Master"
+        if not status:
+            return None
+        return status.get(lag_key)
+    finally:
+        cursor.close()
+
+
+def _replica_is_usable():
+    """
+    Checks (at most every LAG_CHECK_INTERVAL seconds) that the replica is
+    reachable, replicating, and no more than MAX_REPLICA_LAG_SECONDS behind
+    the primary. Only one thread runs the check at a time; concurrent callers
+    get the previous result. A change of state is printed once, not on every
+    check.
+
+    :raises ReplicaConfigError: If the replica user lacks the REPLICATION CLIENT
+                                privilege needed to read the lag.
+    """
+    now = time.monotonic()
+    if now - _replica_state["checked_at"] < LAG_CHECK_INTERVAL:
+        return _replica_state["usable"]
+    if not _replica_check_lock.acquire(blocking=False):
+        return _replica_state["usable"]
+
+    try:
+        usable = False
+        try:
+            conn = _get_pool("read", REPLICA_DB).get_connection()
+            try:
+                lag = _replica_lag(conn)
+            finally:
+                conn.close()
+            usable = lag is not None and lag <= MAX_REPLICA_LAG_SECONDS
+            if lag is None:
+                reason = "replica is not replicating"
+            else:
+                reason = f"replica lag is {lag}s"
+        except pooling.PoolError:
+            # Every replica connection is busy: that says nothing about the
+            # lag, so keep the previous state and check again next time.
+            return _replica_state["usable"]
+        except Error as e:
+            if e.errno == errorcode.ER_SPECIFIC_ACCESS_DENIED_ERROR:
+                raise ReplicaConfigError(
+                    f"User '{REPLICA_DB['user']}' cannot read the replication status of "
+                    f"{REPLICA_DB['host']}:{REPLICA_DB['port']} ({e}). Grant it REPLICATION CLIENT, "
+                    f"or point MYSQL_REPLICA_* at the primary to disable the read/write split."
+                ) from e
+            reason = f"replica unavailable: {e}"
+
+        if usable != _replica_state["usable"] or _replica_state["checked_at"] == 0.0:
+            if usable:
+                print("Replica is in sync, routing reads to the replica.")
+            else:
+                print(f"Routing reads to the primary ({reason}).")
+
+        _replica_state["checked_at"] = now
+        _replica_state["usable"] = usable
+        return usable
+    finally:
+        _replica_check_lock.release()
+
+
+def get_write_connection():
+    """Returns a pooled connection to the primary (write) server, or None on error."""
+    try:
+        return _get_pool("write", PRIMARY_DB).get_connection()
+    except Error as e:
+        print(f"Error connecting to primary DB: {e}")
+        return None
+
+
+def get_read_connection():
+    """
+    Returns a pooled connection for read-only queries.
+    Uses the replica, unless it is unreachable or lagging behind, in which
+    case the primary is used instead. Returns None on error, or raises it
+    inside strict_reads().
+
+    :raises ReplicaConfigError: See _replica_is_usable.
+    """
+    conn = None
+    if not REPLICA_IS_PRIMARY and _replica_is_usable():
+        try:
+            conn = _get_pool("read", REPLICA_DB).get_connection()
+        except Error as e:
+            print(f"Error connecting to replica DB, falling back to primary: {e}")
+
+    if conn is None:
+        if raise_errors():
+            conn = _get_pool("write", PRIMARY_DB).get_connection()
+        else:
+            conn = get_write_connection()
+
+    if conn is not None and raise_errors():
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SET SESSION max_execution_time = %s",
+                           (_thread_settings.max_execution_ms,))
+            cursor.close()
+        except Error:
+            conn.close()
+            raise
+    return conn
@@ -1,24 +1,13 @@
-import mysql.connector
 from mysql.connector import Error
-from common import DATABASE_NAME
+from db_connections import get_read_connection, raise_errors
 
 def get_db_connection():
     """
-    Returns a MySQL database connection using env variables:
-    MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE.
+    Returns a MySQL connection for the read-only queries below.
+    It comes from the replica pool, or from the primary when the replica
+    is unreachable or lagging (see db_connections.get_read_connection).
     """
-    try:
-        conn = mysql.connector.connect(
-            host="127.0.0.2",
-            port="3333",
-            user="natanel",
-            password="nat72836",
-            database=DATABASE_NAME
-        )
-        return conn
-    except Error as e:
-        print(f"Error connecting to DB: {e}")
-        return None
+    return get_read_connection()
 
 
 def query_1():
@@ -61,6 +50,8 @@ def query_1():
 
     except Error as e:
         print(f"Error in query_1: {e}")
+        if raise_errors():
+            raise
         return []
     finally:
         cursor.close()
@@ -108,6 +99,8 @@ def query_2():
 
     except Error as e:
         print(f"Error in query_2: {e}")
+        if raise_errors():
+            raise
         return []
     finally:
         cursor.close()
@@ -150,6 +143,8 @@ def query_3(substring):
 
     except Error as e:
         print(f"Error in query_3: {e}")
+        if raise_errors():
+            raise
         return []
     finally:
         cursor.close()
@@ -183,6 +178,8 @@ def query_4(substring):
 
     except Error as e:
         print(f"Error searching for substring {substring}: {e}")
+        if raise_errors():
+            raise
 
     finally:
         if 'cursor' in locals() and cursor is not None:
@@ -226,9 +223,147 @@ def query_5(min_popularity: int):
 
     except Error as e:
         print(f"Error in query_5: {e}")
+        if raise_errors():
+            raise
         return []
     finally:
         if cursor:
             cursor.close()
         if conn and conn.is_connected():
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+# Width of movies.title and movie_credits.character_name_or_job_title.
+MAX_SEARCH_TERM_LENGTH = 255
+
+
+def _load_search_terms(cursor, substrings):
+    """
+    Fills the per-connection temporary table 'search_terms' with one
+    '%substring%' pattern per distinct search term. Terms longer than the
+    searched VARCHAR(255) columns cannot match anything and are left out.
+
+    Returns the list of distinct terms, in input order; a term's position in
+    this list is its term_idx in the table.
+    The table is dropped when the pooled connection is returned (session reset).
+    """
+    terms = list(dict.fromkeys(substrings))
+
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS search_terms;")
+    cursor.execute("""
+        CREATE TEMPORARY TABLE search_terms (
+            term_idx INT PRIMARY KEY,
+            pattern TEXT
+        );
+    """)
+    # executemany() sends all the terms as one multi-row INSERT.
+    cursor.executemany(
+        "INSERT INTO search_terms (term_idx, pattern) VALUES (%s, %s)",
+        [(idx, f"%{term.strip()}%") for idx, term in enumerate(terms)
+         if len(term.strip()) <= MAX_SEARCH_TERM_LENGTH]
+    )
+    return terms
+
+
+def query_3_batch(substrings):
+    """
+    Batch variant of query_3: searches 'movies.title' for every substring
+    in `substrings` with a single query, instead of one query per term.
+
+    Returns a dict mapping each search term to the same list query_3 would
+    return for it (id, title, popularity; ordered by popularity desc, up to 10).
+    """
+    if not substrings:
+        return {}
+
+    conn = get_db_connection()
+    if not conn:
+        return {}
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        terms = _load_search_terms(cursor, substrings)
+
+        # ROW_NUMBER() applies the per-term ORDER BY ... LIMIT 10 of query_3.
+        sql = """
+            SELECT term_idx, id, title, popularity
+            FROM (
+                SELECT t.term_idx, m.id, m.title, m.popularity,
+                       ROW_NUMBER() OVER (PARTITION BY t.term_idx
+                                          ORDER BY m.popularity DESC) AS rn
+                FROM search_terms t
+                JOIN movies m ON m.title LIKE t.pattern
+            ) ranked
+            WHERE rn <= 10
+            ORDER BY term_idx, rn;
+        """
+        cursor.execute(sql)
+
+        results = {term: [] for term in terms}
+        for row in cursor.fetchall():
+            term = terms[row.pop('term_idx')]
+            results[term].append(row)
+        return results
+
+    except Error as e:
+        print(f"Error in query_3_batch: {e}")
+        if raise_errors():
+            raise
+        return {}
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def query_4_batch(substrings):
+    """
+    Batch variant of query_4: searches 'character_name_or_job_title' in
+    movie_credits for every substring in `substrings` with a single query.
+
+    Returns a dict mapping each search term to up to 100 DISTINCT movies
+    (id, title). Unlike query_4, whose LIMIT 100 has no ORDER BY, each list
+    is ordered by movie id, so a term with more than 100 matches keeps the
+    100 lowest ids.
+    """
+    if not substrings:
+        return {}
+
+    conn = get_db_connection()
+    if not conn:
+        return {}
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        terms = _load_search_terms(cursor, substrings)
+
+        # ROW_NUMBER() applies the per-term LIMIT 100 of query_4.
+        sql = """
+            SELECT term_idx, id, title
+            FROM (
+                SELECT term_idx, id, title,
+                       ROW_NUMBER() OVER (PARTITION BY term_idx ORDER BY id) AS rn
+                FROM (
+                    SELECT DISTINCT t.term_idx, m.id, m.title
+                    FROM search_terms t
+                    JOIN movie_credits mc ON mc.character_name_or_job_title LIKE t.pattern
+                    JOIN movies m ON mc.movie_id = m.id
+                ) matches
+            ) ranked
+            WHERE rn <= 100
+            ORDER BY term_idx, rn;
+        """
+        cursor.execute(sql)
+
+        results = {term: [] for term in terms}
+        for row in cursor.fetchall():
+            term = terms[row.pop('term_idx')]
+            results[term].append(row)
+        return results
+
+    except Error as e:
+        print(f"Error in query_4_batch: {e}")
+        if raise_errors():
+            raise
+        return {}
+    finally:
+        cursor.close()
+        conn.close()
@@ -1,4 +1,8 @@
+import statistics
+import sys
+
 from queries_db_script import query_1, query_2, query_3, query_4, query_5
+from concurrent_queries import all_queries, run_serially, run_concurrently
 
 def main():
     """
@@ -69,5 +73,51 @@ def main():
 
     print("\n=== End of Demo ===")
 
+# Timed rounds of compare_serial_and_concurrent; the order of the two runs
+# alternates between rounds.
+COMPARE_ROUNDS = 6
+
+def compare_serial_and_concurrent():
+    """
+    Runs query_1 .. query_5 (with the same sample inputs as main()) one after
+    another and all at once, and reports the median wall-clock times.
+
+    An untimed warm-up of both modes first creates the connection pools, runs
+    the first replica-lag check and warms the server's buffer pool, so that
+    neither timed run pays for them.
+    """
+    calls = all_queries(substring_3="man", substring_4="Robin", min_popularity=10)
+
+    print("\n=== Serial vs. Concurrent ===")
+    run_serially(calls)
+    run_concurrently(calls)
+
+    serial_times, concurrent_times = [], []
+    for round_number in range(COMPARE_ROUNDS):
+        if round_number % 2 == 0:
+            serial_results, serial_time = run_serially(calls)
+            concurrent_results, concurrent_time = run_concurrently(calls)
+        else:
+            concurrent_results, concurrent_time = run_concurrently(calls)
+            serial_results, serial_time = run_serially(calls)
+        serial_times.append(serial_time)
+        concurrent_times.append(concurrent_time)
+
+    for name in calls:
+        print(f"{name}: serial {len(serial_results[name])} rows, "
+              f"concurrent {len(concurrent_results[name])} rows")
+
+    serial_time = statistics.median(serial_times)
+    concurrent_time = statistics.median(concurrent_times)
+    print(f"\nMedian of {COMPARE_ROUNDS} rounds (alternating order):")
+    print(f"Serial run:     {serial_time * 1000:.1f} ms")
+    print(f"Concurrent run: {concurrent_time * 1000:.1f} ms")
+    if concurrent_time > 0:
+        print(f"Speedup:        {serial_time / concurrent_time:.2f}x")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python queries_execution.py --concurrent  => serial vs. concurrent timing
+    if "--concurrent" in sys.argv:
+        compare_serial_and_concurrent()
+    else:
+        main()
\ No newline at end of file
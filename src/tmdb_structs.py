@@ -0,0 +1,95 @@
+from typing import List, Optional
+
+import msgspec
+
+# Number of cast / crew members the loader keeps for each movie.
+MAX_CREDITS_PER_TYPE = 50
+
+
+# -----------------------------------------------------------------------------
+# Typed views of the TMDb payloads.
+# -----------------------------------------------------------------------------
+# Only the fields the loader actually reads are declared; msgspec skips every
+# other key while decoding, so no dict/str objects are built for them.
+# Structs use __slots__ internally, and gc=False is safe because they never
+# hold reference cycles.
+# TMDb sometimes sends null for these fields, so they are Optional here and
+# the loader's defaults ('Untitled', 'Unknown', 0.0) are applied after decoding.
+
+class DiscoverMovie(msgspec.Struct, gc=False):
+    """A single entry of GET /discover/movie -> results."""
+    id: int
+    title: Optional[str] = "Untitled"
+    popularity: Optional[float] = 0.0
+
+
+class DiscoverPage(msgspec.Struct, gc=False):
+    """GET /discover/movie response, restricted to the 'results' list."""
+    results: List[DiscoverMovie] = []
+
+
+class CastMember(msgspec.Struct, gc=False):
+    """A single entry of GET /movie/<id>/credits -> cast."""
+    id: int
+    name: Optional[str] = "Unknown"
+    popularity: Optional[float] = 0.0
+    character: Optional[str] = ""
+
+
+class CrewMember(msgspec.Struct, gc=False):
+    """A single entry of GET /movie/<id>/credits -> crew."""
+    id: int
+    name: Optional[str] = "Unknown"
+    popularity: Optional[float] = 0.0
+    job: Optional[str] = ""
+
+
+class MovieCredits(msgspec.Struct, gc=False):
+    """GET /movie/<id>/credits response, restricted to 'cast' and 'crew'."""
+    cast: List[CastMember] = []
+    crew: List[CrewMember] = []
+
+
+# Decoders are built once and reused; building one per call is expensive.
+_discover_decoder = msgspec.json.Decoder(DiscoverPage)
+_credits_decoder = msgspec.json.Decoder(MovieCredits)
+
+
+def decode_discover_page(raw):
+    """
+    Decode a raw /discover/movie response body into a DiscoverPage.
+
+    :param raw: The response body (bytes or str).
+    :rtype: DiscoverPage
+    :raises msgspec.DecodeError: If the body is not valid JSON, or a declared
+                                 field has the wrong type (ValidationError).
+    """
+    page = _discover_decoder.decode(raw)
+    for movie in page.results:
+        if movie.title is None:
+            movie.title = "Untitled"
+        if movie.popularity is None:
+            movie.popularity = 0.0
+    return page
+
+
+def decode_movie_credits(raw):
+    """
+    Decode a raw /movie/<id>/credits response body into a MovieCredits,
+    keeping at most MAX_CREDITS_PER_TYPE cast and crew members.
+
+    :param raw: The response body (bytes or str).
+    :rtype: MovieCredits
+    :raises msgspec.DecodeError: If the body is not valid JSON, or a declared
+                                 field has the wrong type (ValidationError).
+    """
+    credits = _credits_decoder.decode(raw)
+    # Drop the tail right away so the extra structs can be freed immediately.
+    del credits.cast[MAX_CREDITS_PER_TYPE:]
+    del credits.crew[MAX_CREDITS_PER_TYPE:]
+    for person in credits.cast + credits.crew:
+        if person.name is None:
+            person.name = "Unknown"
+        if person.popularity is None:
+            person.popularity = 0.0
+    return credits